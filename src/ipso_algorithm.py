@@ -5,14 +5,124 @@
 
 import numpy as np
 
+class SurrogateArchive:
+    """
+    آرشیو محدود (بافر حلقوی) از نقاط ارزیابی‌شده برای برازش مدل جایگزین
+    
+    موقعیت‌ها و امتیازها در آرایه‌های از پیش تخصیص‌یافته نگهداری می‌شوند و
+    با پر شدن ظرفیت، قدیمی‌ترین نقاط بازنویسی می‌شوند.
+    """
+    def __init__(self, capacity, dimension):
+        self.capacity = capacity
+        self.positions = np.empty((capacity, dimension))
+        self.scores = np.empty(capacity)
+        self.size = 0
+        self._next = 0
+    
+    def add(self, position, score):
+        """افزودن یک نقطه ارزیابی‌شده به آرشیو"""
+        self.positions[self._next] = position
+        self.scores[self._next] = score
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def data(self):
+        """بخش پرشده آرشیو (بدون کپی)"""
+        return self.positions[:self.size], self.scores[:self.size]
+
+class SurrogateModel:
+    """
+    مدل جایگزین ارزان برای پیش‌بینی مقدار تابع هدف
+    
+    Parameters:
+    kind (str): 'rbf' (تابع پایه شعاعی مکعبی با دنباله خطی) یا 'quadratic' (رگرسیون درجه دو)
+    bounds (array): محدوده متغیرها برای نرمال‌سازی ورودی‌ها
+    ridge (float): جمله منظم‌سازی قطر ماتریس کرنل RBF
+    """
+    def __init__(self, kind, bounds, ridge=1e-8):
+        if kind not in ('rbf', 'quadratic'):
+            raise ValueError(f"نوع مدل جایگزین نامعتبر است: {kind}")
+        self.kind = kind
+        self.ridge = ridge
+        self.lower = bounds[:, 0]
+        self.span = np.where(bounds[:, 1] > bounds[:, 0], bounds[:, 1] - bounds[:, 0], 1.0)
+        self.dimension = len(bounds)
+        self._centers = None
+        self._coef = None
+    
+    def min_points(self):
+        """حداقل تعداد نقاط لازم برای برازش مدل"""
+        if self.kind == 'rbf':
+            return self.dimension + 2
+        return (self.dimension + 1) * (self.dimension + 2) // 2
+    
+    def _normalize(self, X):
+        return (X - self.lower) / self.span
+    
+    def _quadratic_features(self, X):
+        iu, ju = np.triu_indices(self.dimension)
+        return np.hstack([np.ones((len(X), 1)), X, X[:, iu] * X[:, ju]])
+    
+    def _rbf_kernel(self, X, centers):
+        sq_dist = (np.sum(X ** 2, axis=1)[:, None] + np.sum(centers ** 2, axis=1)[None, :]
+                   - 2 * X @ centers.T)
+        return np.maximum(sq_dist, 0) ** 1.5
+    
+    def fit(self, X, y):
+        """برازش مدل روی نقاط آرشیو"""
+        X = self._normalize(X)
+        if self.kind == 'quadratic':
+            self._coef = np.linalg.lstsq(self._quadratic_features(X), y, rcond=None)[0]
+            return self
+        
+        n = len(X)
+        P = np.hstack([np.ones((n, 1)), X])
+        m = P.shape[1]
+        A = np.zeros((n + m, n + m))
+        # جمله ridge کوچک برای پایداری در برابر نقاط تکراری (مثلاً بریده‌شده روی مرزها)
+        A[:n, :n] = self._rbf_kernel(X, X) + self.ridge * np.eye(n)
+        A[:n, n:] = P
+        A[n:, :n] = P.T
+        rhs = np.concatenate([y, np.zeros(m)])
+        try:
+            self._coef = np.linalg.solve(A, rhs)
+        except np.linalg.LinAlgError:
+            self._coef = np.linalg.lstsq(A, rhs, rcond=None)[0]
+        self._centers = X.copy()
+        return self
+    
+    def predict(self, X):
+        """پیش‌بینی مقدار تابع هدف برای مجموعه‌ای از موقعیت‌ها"""
+        X = self._normalize(np.atleast_2d(X))
+        if self.kind == 'quadratic':
+            return self._quadratic_features(X) @ self._coef
+        
+        n = len(self._centers)
+        P = np.hstack([np.ones((len(X), 1)), X])
+        return self._rbf_kernel(X, self._centers) @ self._coef[:n] + P @ self._coef[n:]
+
 class ImprovedPSO:
-    def __init__(self, n_particles, max_iter, bounds, objective_func):
+    def __init__(self, n_particles, max_iter, bounds, objective_func,
+                 surrogate=None, screening_fraction=0.3, archive_size=500):
         self.n_particles = n_particles
         self.max_iter = max_iter
         self.bounds = np.array(bounds)
         self.objective_func = objective_func
         self.dimension = len(bounds)
         
+        # تنظیمات حالت کمک‌گرفته از مدل جایگزین (surrogate)
+        # surrogate=None: همه ذرات با تابع هدف واقعی ارزیابی می‌شوند
+        if not 0 < screening_fraction <= 1:
+            raise ValueError("screening_fraction باید در بازه (0, 1] باشد")
+        self.surrogate = SurrogateModel(surrogate, self.bounds) if surrogate else None
+        if self.surrogate is not None and archive_size < self.surrogate.min_points():
+            raise ValueError(f"archive_size باید حداقل {self.surrogate.min_points()} باشد "
+                             f"تا مدل جایگزین '{surrogate}' قابل برازش باشد")
+        self.screening_fraction = screening_fraction
+        self.archive = SurrogateArchive(archive_size, self.dimension) if surrogate else None
+        self.n_evaluations = 0
+        self.n_screened_out = 0
+        
         # Initialize parameters
         self.w_max = 0.9
         self.w_min = 0.4
@@ -34,7 +144,7 @@ class ImprovedPSO:
         
         # Initialize personal best
         self.pbest_positions = self.positions.copy()
-        self.pbest_scores = np.array([self.objective_func(p) for p in self.positions])
+        self.pbest_scores = np.array([self._evaluate(p) for p in self.positions])
         
         # Initialize global best
         self.gbest_index = np.argmin(self.pbest_scores)
@@ -43,8 +153,19 @@ class ImprovedPSO:
         
         self.convergence_history = []
     
+    def _evaluate(self, position):
+        """ارزیابی تابع هدف واقعی و ثبت نتیجه در آرشیو"""
+        score = self.objective_func(position)
+        self.n_evaluations += 1
+        if self.archive is not None:
+            self.archive.add(position, score)
+        return score
+    
     def optimize(self):
         """اجرای الگوریتم بهینه‌سازی"""
+        if self.surrogate is not None:
+            return self._optimize_with_surrogate()
+        
         for iteration in range(self.max_iter):
             # Update inertia weight
             w = self.w_max - (self.w_max - self.w_min) * (iteration / self.max_iter)
@@ -69,7 +190,7 @@ class ImprovedPSO:
                                           self.bounds[:, 1])
                 
                 # Evaluate fitness
-                current_score = self.objective_func(self.positions[i])
+                current_score = self._evaluate(self.positions[i])
                 
                 # Update personal best
                 if current_score < self.pbest_scores[i]:
@@ -84,6 +205,70 @@ class ImprovedPSO:
             self.convergence_history.append(self.gbest_score)
             
         return self.gbest_position, self.gbest_score
+    
+    def _optimize_with_surrogate(self):
+        """
+        اجرای الگوریتم با پیش‌غربالگری ذرات توسط مدل جایگزین
+        
+        در هر تکرار ابتدا موقعیت همه ذرات به‌روزرسانی می‌شود، سپس مدل جایگزین
+        روی آرشیو برازش داده شده و تنها کسری از ذرات که بیشترین بهبود پیش‌بینی‌شده
+        نسبت به pbest را دارند با تابع هدف واقعی ارزیابی می‌شوند.
+        """
+        n_promising = max(1, int(np.ceil(self.screening_fraction * self.n_particles)))
+        
+        for iteration in range(self.max_iter):
+            w = self.w_max - (self.w_max - self.w_min) * (iteration / self.max_iter)
+            
+            # به‌روزرسانی برداری سرعت و موقعیت همه ذرات
+            c1 = self.c1_min + (self.c1_max - self.c1_min) * np.random.rand(self.n_particles, 1)
+            c2 = self.c2_min + (self.c2_max - self.c2_min) * np.random.rand(self.n_particles, 1)
+            r1 = np.random.rand(self.n_particles, 1)
+            r2 = np.random.rand(self.n_particles, 1)
+            cognitive = c1 * r1 * (self.pbest_positions - self.positions)
+            social = c2 * r2 * (self.gbest_position - self.positions)
+            self.velocities = w * self.velocities + cognitive + social
+            self.positions = np.clip(self.positions + self.velocities,
+                                     self.bounds[:, 0], self.bounds[:, 1])
+            
+            # پیش‌غربالگری با مدل جایگزین
+            X, y = self.archive.data()
+            if len(X) >= self.surrogate.min_points() and n_promising < self.n_particles:
+                predicted = self.surrogate.fit(X, y).predict(self.positions)
+                candidates = np.argsort(predicted - self.pbest_scores)[:n_promising]
+            else:
+                candidates = np.arange(self.n_particles)
+            self.n_screened_out += self.n_particles - len(candidates)
+            
+            # ارزیابی ذرات امیدوارکننده با تابع هدف واقعی
+            for i in candidates:
+                current_score = self._evaluate(self.positions[i])
+                
+                if current_score < self.pbest_scores[i]:
+                    self.pbest_positions[i] = self.positions[i]
+                    self.pbest_scores[i] = current_score
+                    
+                    if current_score < self.gbest_score:
+                        self.gbest_position = self.positions[i].copy()
+                        self.gbest_score = current_score
+            
+            self.convergence_history.append(self.gbest_score)
+        
+        return self.gbest_position, self.gbest_score
+    
+    def evaluation_report(self):
+        """
+        گزارش تعداد ارزیابی‌های تابع هدف واقعی
+        
+        Returns:
+        dict: تعداد ارزیابی‌های واقعی، ارزیابی‌های حذف‌شده و درصد کاهش
+        """
+        full_budget = self.n_evaluations + self.n_screened_out
+        return {
+            'true_evaluations': self.n_evaluations,
+            'screened_out': self.n_screened_out,
+            'full_budget': full_budget,
+            'reduction_percentage': 100.0 * self.n_screened_out / full_budget if full_budget else 0.0
+        }
 
 # تابع هدف نمونه برای تست
 def sample_objective_function(x):
@@ -0,0 +1,242 @@
+"""
+موتور ارزیابی ماتریس سناریوها
+محاسبه هزینه کل، صرفه‌جویی و پیک مصرف برای همه ترکیب‌های
+ساختار تعرفه × راهبرد بهینه‌سازی × زیرمجموعه خانوارها
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# آستانه اندازه (تعداد درایه‌های مصرف بهینه‌شده) برای اجرای موازی خودکار
+PARALLEL_THRESHOLD = 5_000_000
+
+def build_consumption_matrix(df, intervals_per_day=96):
+    """
+    تبدیل داده‌های مصرف به آرایه سه‌بعدی
+
+    بازه‌های زمانی بدون داده (برای هر خانوار یا همه خانوارها) با صفر پر می‌شوند
+    تا هر روز دقیقاً intervals_per_day بازه داشته باشد.
+
+    Parameters:
+    df (pd.DataFrame): داده‌های مصرف انرژی
+    intervals_per_day (int): تعداد بازه‌های زمانی در روز
+
+    Returns:
+    tuple: (آرایه مصرف با ابعاد (خانوار، روز، بازه زمانی)، شناسه خانوارها)
+    """
+    pivot = df.pivot_table(index='household_id', columns=['day', 'time_interval'],
+                           values='energy_consumption_kwh', aggfunc='sum', fill_value=0.0)
+    if not df['time_interval'].between(0, intervals_per_day - 1).all():
+        raise ValueError(f"time_interval باید در بازه [0, {intervals_per_day - 1}] باشد")
+    days = np.sort(df['day'].unique())
+    grid = pd.MultiIndex.from_product([days, range(intervals_per_day)],
+                                      names=['day', 'time_interval'])
+    pivot = pivot.reindex(columns=grid, fill_value=0.0)
+    consumption = pivot.to_numpy(dtype=float).reshape(len(pivot), len(days), intervals_per_day)
+    return consumption, pivot.index.to_numpy()
+
+def time_of_use_tariff(peak_rate, off_peak_rate, intervals_per_day=96):
+    """
+    ساخت تعرفه زمان مصرف با ساعات پیک ۶ تا ۹ و ۱۷ تا ۲۲
+
+    Parameters:
+    peak_rate (float): نرخ ساعات پیک
+    off_peak_rate (float): نرخ ساعات غیرپیک
+    intervals_per_day (int): تعداد بازه‌های زمانی در روز
+
+    Returns:
+    np.ndarray: نرخ تعرفه برای هر بازه زمانی روز
+    """
+    hours = np.arange(intervals_per_day) * 24 / intervals_per_day
+    is_peak = ((hours >= 6) & (hours < 9)) | ((hours >= 17) & (hours < 22))
+    return np.where(is_peak, peak_rate, off_peak_rate)
+
+def peak_shifting_strategy(shift_fraction, peak_rates):
+    """
+    ساخت راهبرد جابه‌جایی بار از ساعات گران به ساعات ارزان
+
+    بخشی از مصرف بازه‌های با نرخ بالاتر از کمترین نرخ به‌طور یکنواخت به بازه‌های
+    با کمترین نرخ همان روز منتقل می‌شود؛ مصرف روزانه هر خانوار ثابت می‌ماند.
+
+    Parameters:
+    shift_fraction (float): کسر بار قابل جابه‌جایی در بازه‌های گران
+    peak_rates (array): تعرفه مرجع برای هر بازه روز یا آرایه (روز، بازه)
+
+    Returns:
+    callable: تابعی که آرایه مصرف (خانوار، روز، بازه) را به مصرف بهینه‌شده تبدیل می‌کند
+    """
+    peak_rates = np.asarray(peak_rates, dtype=float)
+    expensive = peak_rates > peak_rates.min()
+    cheap = ~expensive
+    if not expensive.any():
+        raise ValueError("تعرفه مرجع هیچ بازه گرانی برای جابه‌جایی بار ندارد")
+    cheap_per_day = cheap.sum(axis=-1, keepdims=True)
+    if (cheap_per_day == 0).any():
+        raise ValueError("هر روز تعرفه مرجع باید حداقل یک بازه ارزان داشته باشد")
+    cheap_share = cheap / cheap_per_day
+
+    def strategy(consumption):
+        shifted = consumption * np.where(expensive, 1 - shift_fraction, 1.0)
+        moved = (consumption - shifted).sum(axis=-1, keepdims=True)
+        return shifted + moved * cheap_share
+
+    return strategy
+
+def _as_tariff_matrix(tariffs, n_days, intervals_per_day):
+    """تبدیل تعرفه‌ها به ماتریس (تعرفه، روز × بازه)"""
+    rates = []
+    for rate in tariffs.values():
+        rate = np.broadcast_to(np.asarray(rate, dtype=float), (n_days, intervals_per_day))
+        rates.append(rate.reshape(-1))
+    return np.stack(rates)
+
+def _as_subset_masks(subsets, household_ids):
+    """تبدیل زیرمجموعه‌های خانوار به ماتریس عضویت (زیرمجموعه، خانوار)"""
+    masks = np.zeros((len(subsets), len(household_ids)))
+    for g, (name, members) in enumerate(subsets.items()):
+        members = np.asarray(members)
+        unknown = np.setdiff1d(members, household_ids)
+        if len(unknown):
+            raise ValueError(f"شناسه خانوارهای نامعتبر در زیرمجموعه '{name}': {unknown.tolist()}")
+        masks[g] = np.isin(household_ids, members)
+    return masks
+
+def _apply_strategy(strategy, consumption):
+    """اعمال راهبرد (تابع یا ضریب قابل broadcast) روی مصرف"""
+    if callable(strategy):
+        return np.asarray(strategy(consumption), dtype=float)
+    return consumption * np.asarray(strategy, dtype=float)
+
+def _evaluate_strategies(strategies, consumption, tariff_matrix, masks):
+    """اعمال یک دسته از راهبردها روی مصرف و محاسبه هزینه و پیک آن‌ها"""
+    flat_shape = (consumption.shape[0], -1)
+    optimized = np.stack([_apply_strategy(s, consumption).reshape(flat_shape)
+                          for s in strategies])
+    return _evaluate_block(optimized, tariff_matrix, masks)
+
+def _evaluate_block(optimized, tariff_matrix, masks):
+    """
+    محاسبه هزینه و پیک برای یک بلوک از راهبردها
+
+    Parameters:
+    optimized (np.ndarray): مصرف با ابعاد (راهبرد، خانوار، زمان)
+    tariff_matrix (np.ndarray): تعرفه‌ها با ابعاد (تعرفه، زمان)
+    masks (np.ndarray): ماتریس عضویت با ابعاد (زیرمجموعه، خانوار)
+
+    Returns:
+    tuple: هزینه (راهبرد، تعرفه، زیرمجموعه) و پیک (راهبرد، زیرمجموعه)
+    """
+    household_cost = optimized @ tariff_matrix.T
+    cost = np.einsum('shk,gh->skg', household_cost, masks)
+    peak = (masks @ optimized).max(axis=-1)
+    return cost, peak
+
+def evaluate_scenario_matrix(consumption, tariffs, strategies, subsets=None,
+                             household_ids=None, n_jobs=None):
+    """
+    ارزیابی همه ترکیب‌های تعرفه × راهبرد × زیرمجموعه خانوار
+
+    Parameters:
+    consumption (np.ndarray): مصرف با ابعاد (خانوار، روز، بازه زمانی)
+    tariffs (dict): نام تعرفه -> نرخ برای هر بازه روز یا آرایه (روز، بازه)
+    strategies (dict): نام راهبرد -> تابع یا ضریب قابل broadcast روی مصرف
+    subsets (dict): نام زیرمجموعه -> شناسه خانوارها (پیش‌فرض: همه خانوارها)
+    household_ids (array): شناسه خانوارها به ترتیب سطرهای مصرف
+    n_jobs (int): تعداد نخ‌های موازی (پیش‌فرض: خودکار بر اساس اندازه ماتریس و تعداد CPU)
+
+    Returns:
+    pd.DataFrame: یک سطر برای هر سناریو شامل هزینه، صرفه‌جویی و پیک مصرف
+    """
+    consumption = np.asarray(consumption, dtype=float)
+    n_households, n_days, intervals_per_day = consumption.shape
+    if household_ids is None:
+        household_ids = np.arange(1, n_households + 1)
+    household_ids = np.asarray(household_ids)
+    if len(household_ids) != n_households:
+        raise ValueError(f"تعداد شناسه خانوارها ({len(household_ids)}) با تعداد سطرهای "
+                         f"مصرف ({n_households}) برابر نیست")
+    if subsets is None:
+        subsets = {'all': household_ids}
+
+    tariff_matrix = _as_tariff_matrix(tariffs, n_days, intervals_per_day)
+    masks = _as_subset_masks(subsets, household_ids)
+
+    # حالت پایه (بدون بهینه‌سازی) به عنوان اولین راهبرد برای محاسبه صرفه‌جویی
+    all_strategies = [1.0] + list(strategies.values())
+
+    if n_jobs is None:
+        total_size = len(all_strategies) * consumption.size
+        n_jobs = 1 if total_size < PARALLEL_THRESHOLD else (os.cpu_count() or 1)
+    n_jobs = max(1, min(n_jobs, len(all_strategies)))
+
+    # هر نخ هم اعمال راهبردها و هم محاسبه هزینه را برای دسته خود انجام می‌دهد
+    batches = [all_strategies[i::n_jobs] for i in range(n_jobs)]
+    order = np.concatenate([np.arange(len(all_strategies))[i::n_jobs] for i in range(n_jobs)])
+    if n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(
+                lambda batch: _evaluate_strategies(batch, consumption, tariff_matrix, masks),
+                batches))
+    else:
+        parts = [_evaluate_strategies(batches[0], consumption, tariff_matrix, masks)]
+    cost = np.empty((len(all_strategies), len(tariffs), len(subsets)))
+    peak = np.empty((len(all_strategies), len(subsets)))
+    cost[order] = np.concatenate([p[0] for p in parts])
+    peak[order] = np.concatenate([p[1] for p in parts])
+    base_cost, cost = cost[:1], cost[1:]
+    base_peak, peak = peak[:1], peak[1:]
+
+    # مرتب‌سازی نتایج به صورت (تعرفه، راهبرد، زیرمجموعه)
+    cost = cost.transpose(1, 0, 2)
+    base_cost = np.broadcast_to(base_cost.transpose(1, 0, 2), cost.shape)
+    peak = np.broadcast_to(peak[None], cost.shape)
+    base_peak = np.broadcast_to(base_peak[None], cost.shape)
+
+    savings = base_cost - cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        savings_percentage = np.where(base_cost > 0, savings / base_cost * 100, 0.0)
+        peak_reduction = np.where(base_peak > 0, (base_peak - peak) / base_peak * 100, 0.0)
+
+    index = pd.MultiIndex.from_product(
+        [list(tariffs), list(strategies), list(subsets)],
+        names=['tariff', 'strategy', 'subset'])
+    results = pd.DataFrame({
+        'baseline_cost': base_cost.ravel(),
+        'total_cost': cost.ravel(),
+        'savings_amount': savings.ravel(),
+        'savings_percentage': savings_percentage.ravel(),
+        'baseline_peak_demand': base_peak.ravel(),
+        'peak_demand': peak.ravel(),
+        'peak_reduction': peak_reduction.ravel()
+    }, index=index).reset_index()
+    results.insert(0, 'scenario', results['tariff'] + ' | ' +
+                   results['strategy'] + ' | ' + results['subset'].astype(str))
+
+    return results
+
+def to_results_dict(results):
+    """
+    تبدیل نتایج سناریوها به ورودی plot_comparison_results
+
+    Parameters:
+    results (pd.DataFrame): خروجی evaluate_scenario_matrix
+
+    Returns:
+    dict: نام سناریو -> دیکشنری معیارها
+    """
+    return results.set_index('scenario').drop(
+        columns=['tariff', 'strategy', 'subset']).to_dict(orient='index')
+
+def save_scenario_report(results, file_path='../results/scenario_report.csv'):
+    """
+    ذخیره گزارش سناریوها در فایل CSV
+
+    Parameters:
+    results (pd.DataFrame): خروجی evaluate_scenario_matrix
+    file_path (str): مسیر فایل خروجی
+    """
+    results.to_csv(file_path, index=False)
+    return file_path